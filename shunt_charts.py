@@ -0,0 +1,97 @@
+"""ゲージ・経時変化のグラフ描画
+
+画面表示（Streamlit のプロセス）とレポート作成（プロセスプールのワーカー）の両方から使うため、
+Streamlit には依存しない。matplotlib は描画するときに読み込む。
+"""
+from io import BytesIO
+
+import numpy as np
+
+FIGURE_DPI = 150
+GAUGE_FIGSIZE = (4, 1.5)
+# 1 系列あたりの描画点数の上限。これを超える系列は LTTB で間引く
+TREND_POINT_BUDGET = 240
+TREND_MARKER_LIMIT = 60  # これ以下の点数のときだけマーカーを描く
+
+def figure_png(draw, figsize, dpi=FIGURE_DPI):
+    """新しい Figure に draw(fig) で描き、PNG のバイト列を返す（pyplot を使わないのでワーカーでも描ける）"""
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    draw(fig)
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+def lttb_downsample(x, y, threshold):
+    """Largest-Triangle-Three-Buckets で系列の形を保ったまま threshold 点に間引き、残す位置を返す"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean() if end < next_end else x[n - 1]
+        avg_y = y[end:next_end].mean() if end < next_end else y[n - 1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+def draw_threshold_gauge(fig, param, val, base, direction):
+    ax = fig.subplots()
+    if direction == "Below":
+        ax.axvspan(0, base * 0.9, color='red', alpha=0.2)
+        ax.axvspan(base * 0.9, base, color='yellow', alpha=0.2)
+        ax.axvspan(base, base * 2, color='blue', alpha=0.1)
+    else:
+        ax.axvspan(0, base, color='blue', alpha=0.1)
+        ax.axvspan(base, base * 1.1, color='yellow', alpha=0.2)
+        ax.axvspan(base * 1.1, base * 2, color='red', alpha=0.2)
+    ax.scatter(val, 0, color='red', s=100)
+    ax.set_xlim(0, base * 2)
+    ax.set_title(f"{param} Evaluation")
+
+def trend_figsize(n_metrics):
+    return (10, 2.6 * max(1, -(-n_metrics // 2)))
+
+def draw_trend_panel(fig, data, metrics):
+    """選択された項目の経時変化を 1 枚の図（2 列の小さなグラフの並び）に描く
+
+    data は date 列（タイムゾーンなしの datetime）と各項目の列を持つ。点数が
+    TREND_POINT_BUDGET を超える系列は LTTB で間引き、目盛りは日付範囲に応じて自動で決める。
+    """
+    import matplotlib.dates as mdates
+    n_rows = max(1, -(-len(metrics) // 2))
+    axs = np.atleast_1d(fig.subplots(n_rows, 2, sharex=True, squeeze=False).ravel())
+    data = data.sort_values("date")
+    for ax, metric in zip(axs, metrics):
+        series = data[["date", metric]].dropna()
+        x = mdates.date2num(series["date"].to_numpy())
+        y = series[metric].to_numpy(dtype=float)
+        keep = lttb_downsample(x, y, TREND_POINT_BUDGET)
+        ax.plot(x[keep], y[keep], marker="o" if len(keep) <= TREND_MARKER_LIMIT else None, markersize=4, linewidth=1.2)
+        title = f"{metric} Trend" if len(keep) == len(x) else f"{metric} Trend ({len(keep)}/{len(x)} pts)"
+        ax.set_title(title)
+        ax.set_ylabel(metric)
+        ax.grid(True)
+        ax.xaxis_date()
+        locator = mdates.AutoDateLocator(minticks=3, maxticks=8)
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        ax.tick_params(axis="x", labelbottom=True)
+    for ax in axs[len(metrics):]:
+        ax.set_visible(False)
+    fig.tight_layout()
+
+# 描画条件の種類 → 描画関数。描画条件（種類・引数・図の大きさ）はプロセス間で受け渡せる
+CHART_DRAWERS = {"gauge": draw_threshold_gauge, "trend_panel": draw_trend_panel}
+
+def draw_chart(kind, args, figsize):
+    """描画条件どおりに描いた PNG を返す"""
+    return figure_png(lambda fig: CHART_DRAWERS[kind](fig, *args), figsize)
@@ -0,0 +1,168 @@
+"""シャント機能評価レポート（PDF）の作成
+
+プロセスプールのワーカーから呼ばれるため、Streamlit や Supabase には依存しない。
+グラフは親プロセスで描画済みの PNG（バイト列）を受け取るか、描画条件を受け取ってワーカー内で描き、
+描いた PNG は親プロセスのキャッシュに入れられるよう PDF と一緒に返す。
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from io import BytesIO
+import multiprocessing
+
+import fpdf
+from fpdf import FPDF
+from PIL import Image
+
+from shunt_charts import draw_chart
+
+# 日本語フォント（TrueType のみ。FPDF 1.7.2 は .ttc / .otf を読めない）の候補
+REPORT_FONT_CANDIDATES = [
+    os.environ.get("SHUNT_REPORT_FONT", ""),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts", "ipaexg.ttf"),
+    "/usr/share/fonts/opentype/ipaexfont-gothic/ipaexg.ttf",
+    "/usr/share/fonts/truetype/ipaexfont-gothic/ipaexg.ttf",
+    "/usr/share/fonts/opentype/ipafont-gothic/ipag.ttf",
+    "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
+    "/Library/Fonts/ipaexg.ttf",
+    "C:/Windows/Fonts/ipaexg.ttf",
+]
+# 解析済みフォント情報（.pkl）の保存先。2 回目以降はフォントファイルを解析しない
+REPORT_FONT_CACHE_DIR = os.path.join("data", "font_cache")
+REPORT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+@lru_cache(maxsize=1)
+def find_report_font():
+    """使える日本語フォントのパス。見つからなければ None（英語表記で出力する）"""
+    for path in REPORT_FONT_CANDIDATES:
+        if path and os.path.isfile(path) and path.lower().endswith(".ttf"):
+            return path
+    return None
+
+def _new_pdf(font_path):
+    pdf = FPDF(orientation="P", unit="mm", format="A4")
+    pdf.set_auto_page_break(True, margin=15)
+    if font_path:
+        os.makedirs(REPORT_FONT_CACHE_DIR, exist_ok=True)
+        fpdf.fpdf.FPDF_CACHE_MODE = 2
+        fpdf.fpdf.FPDF_CACHE_DIR = REPORT_FONT_CACHE_DIR
+        pdf.add_font("jp", "", font_path, uni=True)
+    return pdf
+
+def _save_image(png, directory, name):
+    """PNG を JPEG で保存する（FPDF 1.7.2 は JPEG をそのまま埋め込めるが、PNG は Python で展開する）"""
+    path = os.path.join(directory, name + ".jpg")
+    Image.open(BytesIO(png)).convert("RGB").save(path, quality=90)
+    return path
+
+def draw_report_charts(report):
+    """描画条件（dict）で渡されたゲージ・経時変化を PNG にした report と、描いた {キャッシュキー: PNG} を返す"""
+    drawn = {}
+
+    def draw(chart):
+        if isinstance(chart, dict):
+            drawn[chart["key"]] = draw_chart(chart["kind"], chart["args"], chart["figsize"])
+            return drawn[chart["key"]]
+        return chart
+
+    report = dict(report, gauges=[draw(chart) for chart in report["gauges"]], trend=draw(report["trend"]))
+    return report, drawn
+
+def build_report_pdf(report, font_path=None, translations=None):
+    """1 患者分のレポートを作り、PDF のバイト列を返す
+
+    report は患者名・最新値・スコア・コメント・次回予定と、描画済みのゲージ / 経時変化の PNG を持つ dict。
+    日本語フォントがない場合は translations（日本語 → 英語）で見出しを英語にし、氏名の代わりに
+    anon_id を表示する。日本語の所見コメントは出力しない。
+    """
+    translations = translations or {}
+    jp = font_path is not None
+
+    def label(text):
+        if jp:
+            return text
+        # 訳語がない日本語は Helvetica で出せないので "?" に置き換える
+        return translations.get(text, text).encode("latin-1", "replace").decode("latin-1")
+
+    def set_font(size, bold=False):
+        if jp:
+            pdf.set_font("jp", "", size)
+        else:
+            pdf.set_font("Helvetica", "B" if bold else "", size)
+
+    def heading(text):
+        pdf.ln(3)
+        set_font(12, bold=True)
+        pdf.cell(0, 8, label(text), ln=1)
+        set_font(10)
+
+    pdf = _new_pdf(font_path)
+    pdf.add_page()
+    set_font(16, bold=True)
+    pdf.cell(0, 10, label("シャント機能評価レポート"), ln=1)
+
+    set_font(10)
+    patient = report["name"] if jp else report["anon_id"]
+    pdf.cell(0, 6, f"{label('氏名')}: {patient}    {label('検査日')}: {report['exam_date']}", ln=1)
+    pdf.cell(0, 6, f"{label('VA Type')}: {label(report['va_type'])}    {label('特記事項')}: {label(report['tag'])}", ln=1)
+
+    heading("最新の検査値")
+    width = 190 / len(report["values"])
+    for metric in report["values"]:
+        pdf.cell(width, 7, metric, border=1, align="C")
+    pdf.ln()
+    for value in report["values"].values():
+        pdf.cell(width, 7, "-" if value is None else f"{value:g}", border=1, align="C")
+    pdf.ln()
+
+    heading("評価スコア")
+    pdf.cell(0, 6, f"{report['score']} / 4    {label(report['risk'])}", ln=1)
+    for text, flag in zip(report["comments"], report["flags"]):
+        pdf.cell(0, 6, f"- {text if jp else flag}", ln=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        heading("評価結果")
+        top = pdf.get_y()
+        for i, png in enumerate(report["gauges"]):
+            pdf.image(_save_image(png, tmp, f"gauge_{i}"), x=10 + (i % 2) * 95, y=top + (i // 2) * 36, w=90)
+        pdf.set_y(top + 36 * -(-len(report["gauges"]) // 2))
+
+        if jp:
+            heading("AI診断コメント")
+            pdf.multi_cell(0, 6, report["ai_comment"])
+            for text in report["ai_supplements"]:
+                pdf.multi_cell(0, 6, f"- {text}")
+        else:
+            pdf.ln(2)
+            pdf.cell(0, 6, "(Japanese comments are omitted: no Japanese font available)", ln=1)
+
+        heading("次回検査日")
+        followup = report.get("followup")
+        if followup:
+            pdf.cell(0, 6, f"{followup['date']}    {label(followup['comment'])}", ln=1)
+        else:
+            pdf.cell(0, 6, "-", ln=1)
+
+        if report.get("trend"):
+            pdf.add_page()
+            heading("経時変化")
+            pdf.image(_save_image(report["trend"], tmp, "trend"), x=10, w=190)
+
+        return pdf.output(dest="S").encode("latin-1")
+
+def report_file_name(report):
+    return f"report_{report['anon_id']}_{report['exam_date'][:10]}.pdf"
+
+def make_report_pool(max_workers=REPORT_MAX_WORKERS):
+    """レポート作成用のプロセスプール（spawn で起動し、親のスレッドを引き継がない）"""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+def _build_report_in_worker(report, font_path=None, translations=None):
+    report, drawn = draw_report_charts(report)
+    return build_report_pdf(report, font_path, translations), drawn
+
+def build_reports(pool, reports, translations=None):
+    """複数患者のレポートを並列に作り、(ファイル名, PDF のバイト列, ワーカーで描いた {キャッシュキー: PNG}) のリストを返す"""
+    worker = partial(_build_report_in_worker, font_path=find_report_font(), translations=translations)
+    return [(report_file_name(r), pdf, drawn) for r, (pdf, drawn) in zip(reports, pool.map(worker, reports))]
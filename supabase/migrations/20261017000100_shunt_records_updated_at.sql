@@ -0,0 +1,17 @@
+-- ローカルミラーの差分同期用: shunt_records の更新日時と、その透かし検索用インデックス
+alter table shunt_records add column if not exists updated_at timestamptz not null default now();
+
+create or replace function set_updated_at() returns trigger as $$
+begin
+  new.updated_at = now();
+  return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists shunt_records_set_updated_at on shunt_records;
+create trigger shunt_records_set_updated_at
+  before update on shunt_records
+  for each row execute function set_updated_at();
+
+create index if not exists shunt_records_access_code_updated_at_idx on shunt_records (access_code, updated_at);
+create index if not exists shunt_records_access_code_id_idx on shunt_records (access_code, id);
@@ -0,0 +1,55 @@
+-- 患者テーブル: 氏名を記録ごとに持つ代わりに、施設（access_code）ごとの患者を id で参照する
+create table if not exists patients (
+  id bigint generated by default as identity primary key,
+  access_code text not null,
+  name text not null,
+  anon_id text not null,
+  created_at timestamptz not null default now(),
+  updated_at timestamptz not null default now(),
+  unique (access_code, name)
+);
+
+create index if not exists patients_access_code_anon_id_idx on patients (access_code, anon_id);
+create index if not exists patients_access_code_updated_at_idx on patients (access_code, updated_at);
+
+drop trigger if exists patients_set_updated_at on patients;
+create trigger patients_set_updated_at
+  before update on patients
+  for each row execute function set_updated_at();
+
+alter table shunt_records add column if not exists patient_id bigint references patients (id) on delete cascade;
+create index if not exists shunt_records_patient_id_date_idx on shunt_records (patient_id, date);
+
+-- 既存の記録から患者を作る（anon_id は各氏名の最新の記録のもの）
+insert into patients (access_code, name, anon_id)
+select distinct on (access_code, name) access_code, name, coalesce(anon_id, substr(md5(random()::text), 1, 8))
+from shunt_records
+where access_code is not null and coalesce(name, '') <> ''
+order by access_code, name, date desc
+on conflict (access_code, name) do nothing;
+
+update shunt_records r
+set patient_id = p.id, anon_id = p.anon_id
+from patients p
+where r.patient_id is null and p.access_code = r.access_code and p.name = r.name;
+
+-- patient_id なしで追加された記録（オフラインで作った新患者・旧バージョンのクライアント）は
+-- 氏名から患者を引き、なければ作る。shunt_records.name は検査時点の氏名として残す
+create or replace function resolve_record_patient() returns trigger as $$
+begin
+  if new.patient_id is null and coalesce(new.name, '') <> '' then
+    insert into patients (access_code, name, anon_id)
+    values (new.access_code, new.name, coalesce(new.anon_id, substr(md5(random()::text), 1, 8)))
+    on conflict (access_code, name) do nothing;
+    select id, anon_id into new.patient_id, new.anon_id
+    from patients
+    where access_code = new.access_code and name = new.name;
+  end if;
+  return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists shunt_records_resolve_patient on shunt_records;
+create trigger shunt_records_resolve_patient
+  before insert on shunt_records
+  for each row execute function resolve_record_patient();
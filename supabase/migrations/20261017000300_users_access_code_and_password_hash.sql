@@ -0,0 +1,22 @@
+-- アクセスコードをサーバー側のシーケンスで採番する（users 全件の件数から求めていたのをやめる）
+create sequence if not exists users_access_code_seq;
+select setval(
+  'users_access_code_seq',
+  coalesce((select max(substring(access_code from '^shunt([0-9]+)$')::bigint) from users), 0) + 1,
+  false
+);
+
+create or replace function next_access_code() returns text as $$
+  select 'shunt' || lpad(n::text, greatest(4, length(n::text)), '0')
+  from nextval('users_access_code_seq') as n;
+$$ language sql;
+
+alter table users alter column access_code set default next_access_code();
+create unique index if not exists users_access_code_key on users (access_code);
+
+-- パスワードはアプリ側の秘密鍵（AUTH_PEPPER）による HMAC-SHA256 で保存する。
+-- 既存ユーザーの平文パスワードは、次回ログイン時にアプリがハッシュへ置き換える
+alter table users add column if not exists password_hash text;
+alter table users alter column password drop not null;
+create unique index if not exists users_password_hash_key on users (password_hash);
+create index if not exists users_password_legacy_idx on users (password) where password_hash is null;
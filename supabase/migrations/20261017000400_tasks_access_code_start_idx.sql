@@ -0,0 +1,2 @@
+-- ToDo ページはカレンダーの表示範囲のタスクだけを取得する（access_code + start の範囲検索）
+create index if not exists tasks_access_code_start_idx on tasks (access_code, start);
@@ -0,0 +1,13 @@
+-- 本日の検査予定（ワークリスト）: 実施済みの記録と、日付範囲検索・差分同期用のインデックス
+alter table followups add column if not exists completed_at timestamptz;
+alter table followups add column if not exists updated_at timestamptz not null default now();
+
+drop trigger if exists followups_set_updated_at on followups;
+create trigger followups_set_updated_at
+  before update on followups
+  for each row execute function set_updated_at();
+
+create index if not exists followups_access_code_followup_at_idx on followups (access_code, followup_at);
+create index if not exists followups_access_code_updated_at_idx on followups (access_code, updated_at);
+-- 期限を過ぎた未実施の予定だけを引くための部分インデックス
+create index if not exists followups_open_idx on followups (access_code, followup_at) where completed_at is null;
@@ -0,0 +1,69 @@
+"""ToDo ページ（ログイン後の初期ページ）の表示テスト
+
+Supabase の代わりに、どのテーブルにも行がない PostgREST 互換の最小サーバーを立てて、アプリ全体を
+streamlit.testing の AppTest で実行する。
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = Path(__file__).resolve().parent.parent / "shunt-eval-app.py"
+
+class EmptyPostgrestHandler(BaseHTTPRequestHandler):
+    """すべての問い合わせに空の結果を返す"""
+
+    def _reply(self, status):
+        body = json.dumps([]).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Range", "*/0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply(200)
+
+    def do_HEAD(self):
+        self._reply(200)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._reply(201)
+
+    do_PATCH = do_POST
+    do_DELETE = do_POST
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def empty_supabase():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EmptyPostgrestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+def test_todo_page_renders_without_tasks(empty_supabase, tmp_path, monkeypatch):
+    # ローカルミラー・計測ログ（data/ 以下）はテスト用の一時ディレクトリに作る
+    monkeypatch.chdir(tmp_path)
+    at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+    at.secrets["SUPABASE_URL"] = empty_supabase
+    at.secrets["SUPABASE_KEY"] = "test-anon-key"
+    at.secrets["AUTH_PEPPER"] = "test-pepper"
+    at.secrets["ADMIN_ACCESS_CODES"] = ""
+    at.session_state["authenticated"] = True
+    at.session_state["generated_access_code"] = "shunt0001"
+    at.session_state["password"] = "0000"
+    at.session_state["page"] = "ToDoリスト"
+
+    at.run()
+
+    assert not at.exception
+    assert at.session_state["page"] == "ToDoリスト"
+    assert any("対象期間にタスクはありません" in caption.value for caption in at.caption)